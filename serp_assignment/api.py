@@ -4,13 +4,29 @@ FastAPI server for the Brave Search scraper.
 Usage:
     uvicorn serp_assignment.api:app --reload
 
+    # Faster event loop and HTTP parser (needs uvicorn[standard]):
+    uvicorn serp_assignment.api:app --loop uvloop --http httptools
+
+    # One worker per core (cache and rate limits are per worker):
+    uvicorn serp_assignment.api:app --loop uvloop --http httptools --workers $(nproc)
+
 Then POST to http://localhost:8000/search with JSON body: {"query": "your search"}
+
+Environment:
+    SEARCH_RATE_LIMIT          Per-client limit on /search (default "10/second").
+    SEARCH_RATE_LIMIT_ENABLED  Set to 0 to turn the limit off, e.g. for load tests.
 """
 
-from fastapi import FastAPI, HTTPException
+import os
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
 
-from .scraper import search
+from .scraper import search, open_client, close_client
 from .models import ParsedSerp
 
 
@@ -18,30 +34,102 @@ app = FastAPI(
     title="Brave Search Scraper API",
     description="A simple API to scrape Brave Search results",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Per-client-IP request rate on /search. This only stops a single caller
+# from flooding the API; it doesn't bound upstream load, since many
+# clients (or the limit turned off) can still queue any number of
+# requests behind the scraper's politeness semaphore.
+SEARCH_RATE_LIMIT = os.environ.get("SEARCH_RATE_LIMIT", "10/second")
+RATE_LIMIT_ENABLED = os.environ.get("SEARCH_RATE_LIMIT_ENABLED", "1") != "0"
+limiter = Limiter(key_func=get_remote_address, enabled=RATE_LIMIT_ENABLED)
+app.state.limiter = limiter
+
+
+# Scraper failure statuses surfaced as HTTP errors, so clients can tell an
+# upstream block apart from a result and back off instead of retrying.
+# Upstream blocks get their own code: retrying them only means more
+# requests to Brave, unlike this API's own agent.rate_limited.
+_ERROR_STATUSES = {
+    "blocked": (429, "agent.upstream_blocked"),
+    "request_error": (502, "agent.upstream_error"),
+    "parse_error": (502, "agent.parse_failed"),
+    "error": (500, "agent.internal_error"),
+}
+BLOCKED_RETRY_AFTER_SECONDS = 30
+
+
+def error_response(status_code: int, code: str, message: str) -> ORJSONResponse:
+    """Build the stable {"code", "message"} error envelope."""
+    return ORJSONResponse({"code": code, "message": message}, status_code=status_code)
+
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded(request: Request, exc: RateLimitExceeded) -> ORJSONResponse:
+    """Reject over-limit callers with 429, a stable error code and Retry-After."""
+    response = error_response(429, "agent.rate_limited", "Rate limit exceeded")
+    # The window length is an upper bound on when the limit resets.
+    response.headers["Retry-After"] = str(exc.limit.limit.get_expiry())
+    return response
+
+
+@app.on_event("startup")
+async def startup() -> None:
+    """Open the shared Brave Search HTTP client."""
+    await open_client()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    """Close the shared Brave Search HTTP client."""
+    await close_client()
+
 
 class SearchRequest(BaseModel):
     """Request body for the search endpoint."""
     query: str
 
 
-@app.post("/search", response_model=ParsedSerp)
-def search_endpoint(request: SearchRequest) -> ParsedSerp:
+# response_model=None skips re-validating our own output on the way out;
+# the ParsedSerp schema is still published for the docs via `responses`.
+@app.post(
+    "/search",
+    response_model=None,
+    responses={
+        200: {"model": ParsedSerp},
+        429: {"description": "Rate limited by this API or blocked by Brave"},
+        500: {"description": "Unexpected scraper error"},
+        502: {"description": "Brave Search request or parse failed"},
+    },
+)
+@limiter.limit(SEARCH_RATE_LIMIT)
+async def search_endpoint(request: Request, body: SearchRequest) -> ORJSONResponse:
     """
     Search Brave and return parsed results.
 
     Args:
-        request: JSON body with "query" field.
+        request: The incoming request (used for per-client rate limiting).
+        body: JSON body with "query" field.
 
     Returns:
-        ParsedSerp with search results or error info.
+        ParsedSerp with search results. Blocked scrapes return HTTP 429 with
+        Retry-After; failed requests or parses return HTTP 502, and any
+        other scraper error HTTP 500.
     """
-    if not request.query or not request.query.strip():
+    if not body.query or not body.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
-    result = search(request.query.strip())
-    return result
+    result = await search(body.query.strip())
+    if result.status in _ERROR_STATUSES:
+        status_code, code = _ERROR_STATUSES[result.status]
+        response = error_response(status_code, code, result.error_message or result.status)
+        if status_code == 429:
+            response.headers["Retry-After"] = str(BLOCKED_RETRY_AFTER_SECONDS)
+        return response
+
+    # Dump straight to orjson rather than going through jsonable_encoder.
+    return ORJSONResponse(result.model_dump())
 
 
 @app.get("/health")
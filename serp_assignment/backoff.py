@@ -0,0 +1,40 @@
+"""
+Retry backoff shared by the scraper and the load-test client.
+"""
+
+import random
+from typing import Optional
+
+
+BACKOFF_BASE_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 10.0
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[str],
+    max_wait: Optional[float] = None,
+) -> Optional[float]:
+    """
+    Seconds to wait before retrying after a 429/503 response.
+
+    Exponential backoff with jitter (capped at MAX_BACKOFF_SECONDS), but
+    never shorter than a numeric Retry-After.
+
+    Args:
+        attempt: 0-based index of the attempt that just failed.
+        retry_after: The response's Retry-After header, if any.
+        max_wait: Longest Retry-After the caller is willing to honour.
+
+    Returns:
+        The delay in seconds, or None if Retry-After exceeds ``max_wait``
+        and the caller should give up instead of waiting.
+    """
+    delay = min(BACKOFF_BASE_SECONDS * (2 ** attempt), MAX_BACKOFF_SECONDS)
+    delay += random.random() * 0.3
+    if retry_after and retry_after.strip().isdigit():
+        wait = float(retry_after)
+        if max_wait is not None and wait > max_wait:
+            return None
+        delay = max(delay, wait)
+    return delay
@@ -6,8 +6,9 @@ Usage:
     python -m serp_assignment.main "your query here"
 """
 
+import asyncio
 import sys
-from .scraper import search
+from .scraper import search, close_client
 from .models import ParsedSerp
 
 
@@ -34,6 +35,14 @@ def print_results(result: ParsedSerp) -> None:
         print()
 
 
+async def run(query: str) -> ParsedSerp:
+    """Run a single search and release the HTTP client afterwards."""
+    try:
+        return await search(query)
+    finally:
+        await close_client()
+
+
 def main() -> None:
     # Default query or take from command line
     if len(sys.argv) > 1:
@@ -43,7 +52,7 @@ def main() -> None:
 
     print(f"Searching Brave for: {query}\n")
 
-    result = search(query)
+    result = asyncio.run(run(query))
     print_results(result)
 
 
@@ -1,19 +1,287 @@
 """
 Brave Search Scraper
 
-YOUR TASK: Implement the scrape() and parse() functions below.
+scrape() fetches a results page from search.brave.com, parse() extracts the
+organic results from it, and search() combines the two with caching and
+error-to-status mapping.
 
-See README.md for detailed instructions.
+See README.md for details.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import codecs
+import random
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from html import unescape
+from typing import Optional
 
+import httpx
+from lxml import etree
+
+from .backoff import backoff_delay
 from .models import ParsedSerp, SerpResult
 from .errors import RequestError, ParseError, BlockedError
 
 
-def scrape(query: str) -> str:
+# Browser-like headers - Brave serves a CAPTCHA page to obvious bots.
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Static request pieces, built once at import rather than per query.
+_SEARCH_URL = "https://search.brave.com/search"
+_PARAMS_TEMPLATE = {"source": "web"}
+
+# Backoff for rate-limited (429) / unavailable (503) responses.
+_RETRY_STATUSES = (429, 503)
+_MAX_ATTEMPTS = 4
+# Don't hold an API request open longer than this waiting on Brave's
+# Retry-After; report the block instead.
+_MAX_RETRY_AFTER_SECONDS = 10.0
+
+# Politeness towards Brave: at most 3 requests in flight, spaced 1-3s apart.
+# Firing faster than that reliably triggers the CAPTCHA interstitial.
+_BRAVE_SEM = asyncio.Semaphore(3)
+_MIN_DELAY_SECONDS = 1.0
+_MAX_DELAY_SECONDS = 3.0
+_LAST_HIT = 0.0
+
+# Brave blocks us by redirecting to, or serving, its captcha challenge.
+# Only markup is matched, never free text: the results page echoes the
+# query in its <title> and body, so a query containing "captcha" must not
+# look like a block. An id or form action can't come from the query (it's
+# HTML-escaped, and query strings are excluded by the [^"?]).
+_CAPTCHA_PATH_RE = re.compile(r"/captcha\b", re.IGNORECASE)
+_CAPTCHA_MARKUP_RE = re.compile(
+    rb'<[a-z]+\b[^>]*\b(?:id|action)="[^"?]*captcha', re.IGNORECASE
+)
+
+# Bodies are streamed and abandoned past this size; a real SERP is ~200KB.
+_MAX_RESPONSE_BYTES = 2_000_000
+_CHUNK_SIZE = 65536
+# Bytes carried over between chunks so CAPTCHA markup split across a chunk
+# boundary is still seen; comfortably longer than a start tag.
+_SNIFF_OVERLAP = 2048
+
+
+def _class_re(*names: str) -> str:
+    """Regex matching a class attribute whose class list contains one of ``names``."""
+    alternatives = "|".join(re.escape(name) for name in names)
+    # \s rather than \b before the name: \b would also match data-class=.
+    return rf'\sclass="(?:[^"]*\s)?(?:{alternatives})(?:\s[^"]*)?"'
+
+
+# Regex fast path over the raw bytes, mirroring _ResultTarget below.
+# Only start tags are matched by regex; where an element ends is found by
+# tracking nesting of its tag name, so a field containing a nested
+# element of the same name isn't cut short, and each result's fields are
+# searched only within its own <div>...</div>.
+_BLOCK_START_RE = re.compile(rb'<div\b[^>]*\sdata-type="web"[^>]*>')
+_BLOCK_CLASS_RE = re.compile(_class_re("snippet").encode())
+# group(1) is None when the first link's href isn't double-quoted.
+_LINK_RE = re.compile(rb'<a\b[^>]*?\shref(?:="([^"]*)")?')
+_TITLE_RE = re.compile(rb"<(\w+)\b[^>]*" + _class_re("title").encode() + rb"[^>]*>")
+_SNIPPET_RE = re.compile(
+    rb"<(\w+)\b[^>]*" + _class_re("snippet-description", "content").encode() + rb"[^>]*>"
+)
+_TAG_RE = re.compile(rb"""<(?:[^>"']|"[^"]*"|'[^']*')+>""")
+# Layouts the regexes don't model; any of these sends the page to the slow
+# path rather than risk disagreeing with it.
+_UNQUOTED_ATTR_RE = re.compile(rb"\s(?:class|data-type)(?:\s+=|=(?!\"))")
+_RAW_TEXT_RE = re.compile(rb"<(?:script|style|!--|!\[CDATA\[)", re.IGNORECASE)
+# libxml2 implicitly closes a <p> at the next block-level start tag; the
+# nesting count can't model that, so such fields go to the slow path.
+_P_CLOSING_TAG_RE = re.compile(
+    rb"<(?:p|div|ul|ol|li|dl|table|h[1-6]|pre|blockquote|section|article|form)\b",
+    re.IGNORECASE,
+)
+_NESTING_RES: dict[bytes, "re.Pattern[bytes]"] = {}
+
+
+def _element_end(html: bytes, pos: int, tag: bytes) -> Optional[int]:
+    """
+    Offset of the end tag closing the ``tag`` element whose start tag ends
+    at ``pos``, or None if it is never closed.
+    """
+    pattern = _NESTING_RES.get(tag)
+    if pattern is None:
+        pattern = re.compile(rb"<(/?)" + re.escape(tag) + rb"\b", re.IGNORECASE)
+        _NESTING_RES[tag] = pattern
+    depth = 1
+    for m in pattern.finditer(html, pos):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return m.start()
+    return None
+
+
+def _element_content(block: bytes, start: "re.Match[bytes]") -> Optional[bytes]:
+    """Inner HTML of the element opened by ``start``, or None if ambiguous."""
+    tag = start.group(1).lower()
+    end = _element_end(block, start.end(), tag)
+    if end is None:
+        return None
+    content = block[start.end():end]
+    if tag == b"p" and _P_CLOSING_TAG_RE.search(content):
+        return None
+    # Script/style text and comments can't be stripped with _TAG_RE.
+    if _RAW_TEXT_RE.search(content):
+        return None
+    return content
+
+
+def _fragment_text(fragment: bytes, encoding: str) -> str:
+    """Whitespace-normalised text of an HTML fragment (raises on bad bytes)."""
+    text = unescape(_TAG_RE.sub(b"", fragment).decode(encoding))
+    return " ".join(text.split())
+
+
+# <meta charset="..."> or <meta http-equiv=... content="...; charset=...">.
+_META_CHARSET_RE = re.compile(
+    rb"""<meta\b[^>]*?charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE
+)
+
+
+def _page_encoding(html: bytes) -> str:
+    """
+    The charset declared in the page head, or UTF-8 if there is none.
+
+    Both parse paths decode with this, so they always agree; without it
+    libxml2 falls back to Latin-1 for undeclared pages.
+    """
+    match = _META_CHARSET_RE.search(html, 0, 4096)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+# In-process LRU cache of successful, non-empty searches, keyed by
+# normalised query.
+# functools.lru_cache can't be used here: it would cache the coroutine
+# object rather than its result.
+_CACHE_MAXSIZE = 1024
+_CACHE_TTL_SECONDS = 300.0
+_CACHE: "OrderedDict[str, tuple[float, ParsedSerp]]" = OrderedDict()
+
+
+def _cache_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _cache_get(query: str) -> Optional[ParsedSerp]:
+    key = _cache_key(query)
+    entry = _CACHE.get(key)
+    if entry is None:
+        return None
+    stored_at, result = entry
+    if time.monotonic() - stored_at > _CACHE_TTL_SECONDS:
+        del _CACHE[key]
+        return None
+    _CACHE.move_to_end(key)
+    # Hand out a copy so callers can't mutate the cached entry.
+    return result.model_copy(update={"query": query}, deep=True)
+
+
+def _cache_put(query: str, result: ParsedSerp) -> None:
+    key = _cache_key(query)
+    _CACHE[key] = (time.monotonic(), result.model_copy(deep=True))
+    _CACHE.move_to_end(key)
+    if len(_CACHE) > _CACHE_MAXSIZE:
+        _CACHE.popitem(last=False)
+
+
+# One shared async client so connections to search.brave.com are kept alive
+# and pooled across calls. Opened by the API on startup (or lazily by the
+# CLI) and closed with close_client().
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _new_client() -> httpx.AsyncClient:
+    # Retries cover connection failures only; HTTP 429 is reported as blocked.
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        retries=2,
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        headers=_HEADERS,
+        timeout=httpx.Timeout(10.0, connect=3.0),
+    )
+
+
+async def open_client() -> None:
+    """Create the shared HTTP client (no-op if it already exists)."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = _new_client()
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client and release its pooled connections."""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+async def _read_capped(resp: httpx.Response) -> bytes:
+    """Read a streamed body, failing fast on CAPTCHA pages or oversize bodies."""
+    declared = resp.headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > _MAX_RESPONSE_BYTES:
+        raise RequestError(f"Response too large ({declared} bytes)")
+
+    chunks = []
+    total = 0
+    tail = b""
+    async for chunk in resp.aiter_bytes(_CHUNK_SIZE):
+        total += len(chunk)
+        if total > _MAX_RESPONSE_BYTES:
+            raise RequestError(f"Response exceeded {_MAX_RESPONSE_BYTES} bytes")
+        # Every chunk is checked, not just the start of the page: a large
+        # inline <head> can push the challenge form past the first chunk.
+        # Stop as soon as it shows up rather than draining the rest.
+        if (_CAPTCHA_MARKUP_RE.search(tail + chunk[:_SNIFF_OVERLAP])
+                or _CAPTCHA_MARKUP_RE.search(chunk)):
+            raise BlockedError("Brave Search returned a CAPTCHA page")
+        tail = chunk[-_SNIFF_OVERLAP:]
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _polite_fetch(params: dict) -> tuple[httpx.Response, bytes]:
+    """
+    GET the search page, respecting the per-domain concurrency and spacing.
+
+    Returns the (closed) response and its body; the body is only read for
+    HTTP 200 responses.
+    """
+    global _LAST_HIT
+    async with _BRAVE_SEM:
+        # Reserve the next send slot before sleeping so concurrent callers
+        # are spread out instead of all waking at the same moment.
+        now = time.monotonic()
+        slot = max(now, _LAST_HIT + random.uniform(_MIN_DELAY_SECONDS, _MAX_DELAY_SECONDS))
+        _LAST_HIT = slot
+        await asyncio.sleep(slot - now)
+        async with _CLIENT.stream("GET", _SEARCH_URL, params=params) as resp:
+            if resp.status_code != 200:
+                return resp, b""
+            return resp, await _read_capped(resp)
+
+
+async def scrape(query: str) -> bytes:
     """
     Fetch search results from Brave Search for the given query.
 
@@ -21,31 +289,198 @@ def scrape(query: str) -> str:
         query: The search query string.
 
     Returns:
-        The raw HTML response content.
+        The raw, undecoded HTML response body.
 
     Raises:
-        RequestError: If the HTTP request fails.
+        RequestError: If the HTTP request fails or the response is too large.
         BlockedError: If the request is blocked (CAPTCHA, rate limit, etc.)
+    """
+    await open_client()
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            resp, body = await _polite_fetch({**_PARAMS_TEMPLATE, "q": query})
+        except httpx.HTTPError as e:
+            raise RequestError(f"Request to Brave Search failed: {e}") from e
+
+        if resp.status_code not in _RETRY_STATUSES or attempt == _MAX_ATTEMPTS - 1:
+            break
+        # Back off instead of retrying immediately and making the block worse.
+        delay = backoff_delay(
+            attempt, resp.headers.get("Retry-After"), max_wait=_MAX_RETRY_AFTER_SECONDS
+        )
+        if delay is None:
+            break
+        await asyncio.sleep(delay)
+
+    if resp.is_redirect:
+        location = httpx.URL(resp.headers.get("Location", ""))
+        if _CAPTCHA_PATH_RE.search(location.path):
+            raise BlockedError("Brave Search redirected to a CAPTCHA page")
+    if resp.status_code == 429:
+        raise BlockedError("Rate limited by Brave Search (HTTP 429)")
+    if resp.status_code != 200:
+        raise RequestError(f"Unexpected HTTP status {resp.status_code}")
+
+    # Left undecoded: parse() decodes it once, using the page's <meta charset>.
+    return body
 
-    TODO (your implementation):
-        1. Investigate Brave Search using browser Developer Tools
-        2. Identify the correct URL and required parameters
-        3. Set appropriate headers (User-Agent, etc.)
-        4. Make the HTTP request using the requests library
-        5. Handle potential errors (connection, timeout, blocking)
-        6. Return the raw HTML content
+
+@dataclass
+class _RawResult:
+    """Lightweight result record used while parsing; see parse()."""
+    # Spelled out rather than dataclass(slots=True), which needs Python 3.10.
+    __slots__ = ("title", "url", "snippet")
+    title: str
+    url: str
+    snippet: str
+
+
+def _parse_fast(html: bytes, encoding: str) -> Optional[list[_RawResult]]:
     """
-    # ===== YOUR CODE HERE =====
-    raise NotImplementedError("Implement the scrape() function")
-    # ==========================
+    Extract results with precompiled regexes, without building a DOM.
+
+    Returns None when the page doesn't fit the expected layout (no result
+    blocks, a result nested in another, class/data-type attributes not in
+    double quotes, a block without a title element, a field holding
+    script or comments, undecodable text, ...), in which case the caller
+    falls back to the lxml target parse.
+    """
+    if _UNQUOTED_ATTR_RE.search(html):
+        return None
+    starts = [
+        m for m in _BLOCK_START_RE.finditer(html)
+        if _BLOCK_CLASS_RE.search(m.group(0))
+    ]
+    if not starts:
+        return None
+
+    results = []
+    for i, start in enumerate(starts):
+        block_end = _element_end(html, start.end(), b"div")
+        if block_end is None:
+            return None
+        # _ResultTarget ignores a result nested inside an open one.
+        if i + 1 < len(starts) and starts[i + 1].start() < block_end:
+            return None
+        block = html[start.end():block_end]
 
+        link = _LINK_RE.search(block)
+        if link is None:
+            continue
+        if link.group(1) is None:
+            return None
+        url = unescape(link.group(1).decode(encoding, errors="replace"))
+        if not url.startswith("http"):
+            continue
+
+        # Both fields are the first matching element in document order,
+        # as in _ResultTarget.
+        title_m = _TITLE_RE.search(block)
+        if title_m is None:
+            return None
+        title_html = _element_content(block, title_m)
+        snippet_m = _SNIPPET_RE.search(block)
+        snippet_html = _element_content(block, snippet_m) if snippet_m else b""
+        if title_html is None or snippet_html is None:
+            return None
+        try:
+            title = _fragment_text(title_html, encoding)
+            snippet = _fragment_text(snippet_html, encoding)
+        except UnicodeDecodeError:
+            return None
+        if not title:
+            continue
+
+        results.append(_RawResult(title, url, snippet))
+    return results
+
+
+class _ResultTarget:
+    """
+    lxml parser target that picks organic results out of the SAX-style
+    event stream, so no DOM is ever built for the page.
 
-def parse(html: str, query: str = "") -> ParsedSerp:
+    Inside each result block it captures the text of the first link, the
+    first ".title" element and the first ".snippet-description"/".content"
+    element, the same fields the regex fast path looks for.
+    """
+
+    def __init__(self) -> None:
+        self.results: list[_RawResult] = []
+        self._depth = 0
+        self._block_depth: Optional[int] = None
+        self._reset_block()
+
+    def _reset_block(self) -> None:
+        self._url: Optional[str] = None
+        # field name -> (depth it closes at, collected text parts)
+        self._open: dict[str, tuple[int, list[str]]] = {}
+        self._done: dict[str, str] = {}
+
+    def _capture(self, field: str) -> None:
+        if field not in self._open and field not in self._done:
+            self._open[field] = (self._depth, [])
+
+    def start(self, tag: str, attrib: dict) -> None:
+        self._depth += 1
+        classes = attrib.get("class", "").split()
+
+        if self._block_depth is None:
+            if tag == "div" and "snippet" in classes and attrib.get("data-type") == "web":
+                self._block_depth = self._depth
+                self._reset_block()
+            return
+
+        if tag == "a" and self._url is None and "href" in attrib:
+            self._url = attrib["href"]
+            self._capture("link")
+        if "title" in classes:
+            self._capture("title")
+        if "snippet-description" in classes or "content" in classes:
+            self._capture("snippet")
+
+    def data(self, data: str) -> None:
+        for _, parts in self._open.values():
+            parts.append(data)
+
+    def end(self, tag: str) -> None:
+        for field, (depth, parts) in list(self._open.items()):
+            if depth == self._depth:
+                self._done[field] = " ".join("".join(parts).split())
+                del self._open[field]
+        if self._depth == self._block_depth:
+            self._finish_block()
+            self._block_depth = None
+        self._depth -= 1
+
+    def _finish_block(self) -> None:
+        if self._url is None or not self._url.startswith("http"):
+            return
+        title = self._done.get("title") or self._done.get("link", "")
+        if not title:
+            return
+        self.results.append(_RawResult(title, self._url, self._done.get("snippet", "")))
+
+    def close(self) -> list[_RawResult]:
+        return self.results
+
+
+def _parse_stream(html: bytes, encoding: str) -> list[_RawResult]:
+    """Extract results by running the page through lxml's target parser (no DOM is built)."""
+    parser = etree.HTMLParser(target=_ResultTarget(), encoding=encoding)
+    try:
+        parser.feed(html)
+        return parser.close()
+    except (etree.LxmlError, ValueError) as e:
+        raise ParseError(f"Could not parse Brave Search HTML: {e}") from e
+
+
+def parse(html: bytes, query: str = "") -> ParsedSerp:
     """
     Parse the raw HTML and extract search results.
 
     Args:
-        html: The raw HTML content from Brave Search.
+        html: The raw HTML bytes from Brave Search.
         query: The original search query (for reference).
 
     Returns:
@@ -54,33 +489,61 @@ def parse(html: str, query: str = "") -> ParsedSerp:
     Raises:
         ParseError: If parsing fails.
 
-    TODO (your implementation):
-        1. Use BeautifulSoup to parse the HTML
-        2. Identify the HTML structure of search results (inspect in browser)
-        3. Extract title, URL, and snippet for each result
-        4. Create SerpResult objects with rank (1, 2, 3, ...)
-        5. Return a ParsedSerp with all results
+    Assumptions (from inspecting the page in the browser):
+        - Each organic result is a <div class="snippet" data-type="web">.
+        - The first link inside it points at the result URL.
+        - The title lives in a ".title" element and the description in
+          ".snippet-description" (older layout) or ".content".
+        - Pages without a <meta charset> are UTF-8 (what Brave serves).
     """
-    # ===== YOUR CODE HERE =====
-    raise NotImplementedError("Implement the parse() function")
-    # ==========================
+    # Try the regex fast path first; it skips building a DOM entirely.
+    encoding = _page_encoding(html)
+    raw = _parse_fast(html, encoding)
+    if raw is None:
+        raw = _parse_stream(html, encoding)
 
+    # Parsing works on slotted _RawResult records; they are turned into
+    # Pydantic models once here. The fields come straight from our own
+    # parser, so validation is skipped.
+    results = [
+        SerpResult.model_construct(title=r.title, url=r.url, snippet=r.snippet, rank=rank)
+        for rank, r in enumerate(raw, start=1)
+    ]
+    return ParsedSerp.model_construct(query=query, results=results)
 
-def search(query: str) -> ParsedSerp:
+
+async def search(query: str) -> ParsedSerp:
     """
     High-level function that scrapes and parses in one call.
 
     This function is provided for convenience - it calls your
     scrape() and parse() implementations.
 
+    Successful results are served from an in-process LRU cache for a few
+    minutes, so repeated queries skip the network round trip entirely.
+    Empty results aren't cached: they are more likely a block page or
+    layout change slipping through than a genuinely empty SERP.
+
     Args:
         query: The search query string.
 
     Returns:
         A ParsedSerp object with the search results.
     """
+    cached = _cache_get(query)
+    if cached is not None:
+        return cached
+
+    result = await _do_search(query)
+    if result.status == "success" and result.results:
+        _cache_put(query, result)
+    return result
+
+
+async def _do_search(query: str) -> ParsedSerp:
+    """Scrape and parse ``query``, mapping scraper errors to a status."""
     try:
-        html = scrape(query)
+        html = await scrape(query)
         result = parse(html, query)
         result.status = "success"
         return result
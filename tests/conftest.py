@@ -0,0 +1,28 @@
+import asyncio
+
+import httpx
+import pytest
+
+from serp_assignment import scraper
+
+
+@pytest.fixture
+def brave(monkeypatch):
+    """Route scraper requests to a handler set by the test, with no delays."""
+    handlers = {}
+
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        return handlers["handler"](request)
+
+    monkeypatch.setattr(scraper, "_MIN_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(scraper, "_MAX_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(scraper, "_CACHE", type(scraper._CACHE)())
+    monkeypatch.setattr(
+        scraper, "_CLIENT", httpx.AsyncClient(transport=httpx.MockTransport(dispatch))
+    )
+
+    def use(handler):
+        handlers["handler"] = handler
+
+    yield use
+    asyncio.run(scraper.close_client())
@@ -4,8 +4,9 @@ Load test for the Brave Search Scraper API.
 Sends 1000 queries to the API and reports statistics.
 
 Usage:
-    1. Start the API server:
-       uvicorn serp_assignment.api:app --port 8000
+    1. Start the API server with the per-client rate limit off (all load
+       comes from one IP, so it would otherwise mostly measure the limiter):
+       SEARCH_RATE_LIMIT_ENABLED=0 uvicorn serp_assignment.api:app --loop uvloop --http httptools --port 8000
 
     2. Run this test:
        python -m tests.load_test
@@ -17,13 +18,16 @@ Usage:
 """
 
 import argparse
+import asyncio
 import time
 import random
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
+import numpy as np
 from dataclasses import dataclass, field
 from typing import Optional
 
+from serp_assignment.backoff import backoff_delay
+
 
 # Sample queries for testing
 SAMPLE_QUERIES = [
@@ -80,6 +84,14 @@ SAMPLE_QUERIES = [
 ]
 
 
+# Backoff for rate-limited (429) / unavailable (503) responses from the API.
+# A 429 is only retried when it's the API's own limiter; retrying an
+# upstream block (agent.upstream_blocked) would just re-scrape Brave.
+RETRY_STATUSES = (429, 503)
+RETRYABLE_429_CODE = "agent.rate_limited"
+MAX_ATTEMPTS = 4
+
+
 @dataclass
 class QueryResult:
     """Result of a single query."""
@@ -101,7 +113,21 @@ class Statistics:
     request_errors: int = 0
     other_errors: int = 0
     total_results: int = 0
-    response_times: list[float] = field(default_factory=list)
+    # Preallocated float64 buffer; only the first response_count are valid.
+    response_times: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    response_count: int = 0
+
+    def add_response_time(self, ms: float) -> None:
+        if self.response_count == len(self.response_times):
+            grown = np.empty(max(16, 2 * len(self.response_times)), dtype=np.float64)
+            grown[:self.response_count] = self.response_times
+            self.response_times = grown
+        self.response_times[self.response_count] = ms
+        self.response_count += 1
+
+    @property
+    def _times(self) -> np.ndarray:
+        return self.response_times[:self.response_count]
 
     @property
     def success_rate(self) -> float:
@@ -111,17 +137,20 @@ class Statistics:
 
     @property
     def avg_response_time(self) -> float:
-        if not self.response_times:
-            return 0.0
-        return sum(self.response_times) / len(self.response_times)
+        return float(self._times.mean()) if self.response_count else 0.0
 
     @property
     def min_response_time(self) -> float:
-        return min(self.response_times) if self.response_times else 0.0
+        return float(self._times.min()) if self.response_count else 0.0
 
     @property
     def max_response_time(self) -> float:
-        return max(self.response_times) if self.response_times else 0.0
+        return float(self._times.max()) if self.response_count else 0.0
+
+    def response_time_percentiles(self, percentiles: list[float]) -> list[float]:
+        if not self.response_count:
+            return [0.0] * len(percentiles)
+        return [float(p) for p in np.percentile(self._times, percentiles)]
 
     @property
     def avg_results_per_query(self) -> float:
@@ -130,60 +159,105 @@ class Statistics:
         return self.total_results / self.successful
 
 
-def send_query(api_url: str, query: str) -> QueryResult:
-    """Send a single query to the API."""
-    start_time = time.time()
-
+def error_body(response: httpx.Response) -> tuple[Optional[str], Optional[str]]:
+    """The (code, message) of an API error envelope, if the body is one."""
     try:
-        response = requests.post(
-            f"{api_url}/search",
-            json={"query": query},
-            timeout=30,
-        )
-        response_time_ms = (time.time() - start_time) * 1000
-
-        if response.status_code != 200:
+        body = response.json()
+    except ValueError:
+        return None, None
+    if not isinstance(body, dict):
+        return None, None
+    return body.get("code"), body.get("message")
+
+
+def should_retry(response: httpx.Response) -> bool:
+    """Whether a response is a transient overload worth backing off and retrying."""
+    if response.status_code == 429:
+        return error_body(response)[0] == RETRYABLE_429_CODE
+    return response.status_code in RETRY_STATUSES
+
+
+def classify_error(response: httpx.Response) -> tuple[str, str]:
+    """Map an API error response (and its {"code", "message"} body) to a status."""
+    code, message = error_body(response)
+    message = message or f"HTTP {response.status_code}"
+
+    if response.status_code == 429:
+        return "blocked", message
+    if code == "agent.parse_failed":
+        return "parse_error", message
+    if response.status_code == 502:
+        return "request_error", message
+    if code == "agent.internal_error":
+        return "error", message
+    return "http_error", message
+
+
+async def send_query(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    api_url: str,
+    query: str,
+) -> QueryResult:
+    """Send a single query to the API."""
+    async with sem:
+        start_time = time.time()
+
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                response = await client.post(
+                    f"{api_url}/search",
+                    json={"query": query},
+                    timeout=30,
+                )
+                if not should_retry(response) or attempt == MAX_ATTEMPTS - 1:
+                    break
+                await asyncio.sleep(backoff_delay(attempt, response.headers.get("Retry-After")))
+            response_time_ms = (time.time() - start_time) * 1000
+
+            if response.status_code != 200:
+                status, message = classify_error(response)
+                return QueryResult(
+                    query=query,
+                    status=status,
+                    result_count=0,
+                    response_time_ms=response_time_ms,
+                    error_message=message,
+                )
+
+            data = response.json()
             return QueryResult(
                 query=query,
-                status="http_error",
-                result_count=0,
+                status=data.get("status", "unknown"),
+                result_count=len(data.get("results", [])),
                 response_time_ms=response_time_ms,
-                error_message=f"HTTP {response.status_code}",
+                error_message=data.get("error_message"),
             )
 
-        data = response.json()
-        return QueryResult(
-            query=query,
-            status=data.get("status", "unknown"),
-            result_count=len(data.get("results", [])),
-            response_time_ms=response_time_ms,
-            error_message=data.get("error_message"),
-        )
-
-    except requests.exceptions.Timeout:
-        return QueryResult(
-            query=query,
-            status="timeout",
-            result_count=0,
-            response_time_ms=(time.time() - start_time) * 1000,
-            error_message="Request timed out",
-        )
-    except requests.exceptions.ConnectionError:
-        return QueryResult(
-            query=query,
-            status="connection_error",
-            result_count=0,
-            response_time_ms=(time.time() - start_time) * 1000,
-            error_message="Connection failed - is the server running?",
-        )
-    except Exception as e:
-        return QueryResult(
-            query=query,
-            status="error",
-            result_count=0,
-            response_time_ms=(time.time() - start_time) * 1000,
-            error_message=str(e),
-        )
+        except httpx.TimeoutException:
+            return QueryResult(
+                query=query,
+                status="timeout",
+                result_count=0,
+                response_time_ms=(time.time() - start_time) * 1000,
+                error_message="Request timed out",
+            )
+        except httpx.ConnectError:
+            return QueryResult(
+                query=query,
+                status="connection_error",
+                result_count=0,
+                response_time_ms=(time.time() - start_time) * 1000,
+                error_message="Connection failed - is the server running?",
+            )
+        except Exception as e:
+            return QueryResult(
+                query=query,
+                status="error",
+                result_count=0,
+                response_time_ms=(time.time() - start_time) * 1000,
+                error_message=str(e),
+            )
 
 
 def generate_queries(n: int) -> list[str]:
@@ -199,14 +273,15 @@ def generate_queries(n: int) -> list[str]:
     return queries
 
 
-def run_load_test(
+async def run_load_test(
+    client: httpx.AsyncClient,
     api_url: str,
     num_queries: int,
     concurrency: int,
 ) -> Statistics:
     """Run the load test and return statistics."""
     queries = generate_queries(num_queries)
-    stats = Statistics()
+    stats = Statistics(response_times=np.empty(num_queries, dtype=np.float64))
     results: list[QueryResult] = []
 
     print(f"Starting load test...")
@@ -217,28 +292,27 @@ def run_load_test(
 
     start_time = time.time()
 
-    with ThreadPoolExecutor(max_workers=concurrency) as executor:
-        futures = {
-            executor.submit(send_query, api_url, query): query
-            for query in queries
-        }
+    # One event loop drives every in-flight query; the semaphore caps
+    # concurrency instead of a pool of OS threads.
+    sem = asyncio.Semaphore(concurrency)
+    tasks = [send_query(client, sem, api_url, query) for query in queries]
 
-        completed = 0
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-            completed += 1
+    completed = 0
+    for next_result in asyncio.as_completed(tasks):
+        result = await next_result
+        results.append(result)
+        completed += 1
 
-            # Progress indicator
-            if completed % 100 == 0 or completed == num_queries:
-                print(f"  Progress: {completed}/{num_queries} ({completed*100//num_queries}%)")
+        # Progress indicator
+        if completed % 100 == 0 or completed == num_queries:
+            print(f"  Progress: {completed}/{num_queries} ({completed*100//num_queries}%)")
 
     total_time = time.time() - start_time
 
     # Aggregate statistics
     for result in results:
         stats.total_queries += 1
-        stats.response_times.append(result.response_time_ms)
+        stats.add_response_time(result.response_time_ms)
 
         if result.status == "success":
             stats.successful += 1
@@ -278,6 +352,10 @@ def run_load_test(
     print(f"  Average:            {stats.avg_response_time:.2f}ms")
     print(f"  Min:                {stats.min_response_time:.2f}ms")
     print(f"  Max:                {stats.max_response_time:.2f}ms")
+    p50, p95, p99 = stats.response_time_percentiles([50, 95, 99])
+    print(f"  p50:                {p50:.2f}ms")
+    print(f"  p95:                {p95:.2f}ms")
+    print(f"  p99:                {p99:.2f}ms")
     print()
     print("RESULTS:")
     print(f"  Total results:      {stats.total_results}")
@@ -302,20 +380,31 @@ def main():
     parser.add_argument("--concurrency", type=int, default=10, help="Concurrent requests")
 
     args = parser.parse_args()
-
-    # Check if server is running
-    try:
-        response = requests.get(f"{args.url}/health", timeout=5)
-        if response.status_code != 200:
-            print(f"Error: Server at {args.url} is not healthy")
+    asyncio.run(run(args.url, args.queries, args.concurrency))
+
+
+async def run(api_url: str, num_queries: int, concurrency: int) -> None:
+    """Check the server is up, then run the load test over one shared client."""
+    # A single pooled client is reused by the health check and every query,
+    # so connections to the API are set up once rather than per request.
+    limits = httpx.Limits(
+        max_connections=concurrency * 2,
+        max_keepalive_connections=concurrency,
+    )
+    async with httpx.AsyncClient(limits=limits) as client:
+        # Check if server is running
+        try:
+            response = await client.get(f"{api_url}/health", timeout=5)
+            if response.status_code != 200:
+                print(f"Error: Server at {api_url} is not healthy")
+                return
+        except httpx.ConnectError:
+            print(f"Error: Cannot connect to {api_url}")
+            print("Make sure the server is running:")
+            print("  SEARCH_RATE_LIMIT_ENABLED=0 uvicorn serp_assignment.api:app --port 8000")
             return
-    except requests.exceptions.ConnectionError:
-        print(f"Error: Cannot connect to {args.url}")
-        print("Make sure the server is running:")
-        print("  uvicorn serp_assignment.api:app --port 8000")
-        return
 
-    run_load_test(args.url, args.queries, args.concurrency)
+        await run_load_test(client, api_url, num_queries, concurrency)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+"""
+Locust load test for the Brave Search Scraper API.
+
+An alternative to load_test.py built on locust's FastHttpUser
+(geventhttpclient), which drives more load from the same client machine
+and reports p50/p95/p99 out of the box.
+
+Usage:
+    1. Start the API server with the per-client rate limit off (all load
+       comes from one IP, so it would otherwise mostly measure the limiter):
+       SEARCH_RATE_LIMIT_ENABLED=0 uvicorn serp_assignment.api:app --loop uvloop --http httptools --port 8000
+
+    2. Run locust headless:
+       locust -f tests/locustfile.py --headless -u 100 -r 10 -t 60s --host http://localhost:8000
+"""
+
+import random
+
+from locust import FastHttpUser, between, task
+
+# locust puts this file's directory on sys.path, so import as a sibling.
+from load_test import SAMPLE_QUERIES
+
+
+class BraveUser(FastHttpUser):
+    """Simulated client that keeps POSTing search queries."""
+    wait_time = between(0.1, 0.5)
+
+    @task
+    def search(self) -> None:
+        # Add some variation to avoid caching, like load_test.generate_queries
+        query = f"{random.choice(SAMPLE_QUERIES)} {random.randint(1, 1000)}"
+        with self.client.post(
+            "/search",
+            json={"query": query},
+            name="/search",
+            catch_response=True,
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"HTTP {response.status_code}")
+                return
+            status = response.json().get("status", "unknown")
+            if status != "success":
+                response.failure(status)
@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from serp_assignment import api, scraper
+from serp_assignment.errors import BlockedError
+from serp_assignment.models import ParsedSerp
+from tests import load_test
+from tests.test_scraper import results_page
+
+
+@pytest.fixture
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(api.limiter, "enabled", False)
+
+
+@pytest.mark.parametrize(
+    "status, http_status, code",
+    [
+        ("blocked", 429, "agent.upstream_blocked"),
+        ("request_error", 502, "agent.upstream_error"),
+        ("parse_error", 502, "agent.parse_failed"),
+        ("error", 500, "agent.internal_error"),
+    ],
+)
+def test_failed_scrapes_return_error_envelopes(monkeypatch, no_rate_limit, status, http_status, code):
+    async def fake_search(query):
+        return ParsedSerp(query=query, status=status, error_message="boom")
+
+    monkeypatch.setattr(api, "search", fake_search)
+    response = TestClient(api.app).post("/search", json={"query": "python"})
+
+    assert response.status_code == http_status
+    assert response.json() == {"code": code, "message": "boom"}
+    assert ("Retry-After" in response.headers) == (http_status == 429)
+
+
+def test_load_test_client_does_not_retry_upstream_blocks(monkeypatch, no_rate_limit):
+    calls = []
+
+    async def blocked_scrape(query):
+        calls.append(query)
+        raise BlockedError("Rate limited by Brave Search (HTTP 429)")
+
+    monkeypatch.setattr(scraper, "scrape", blocked_scrape)
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await load_test.send_query(client, asyncio.Semaphore(1), "http://test", "python")
+
+    result = asyncio.run(run())
+
+    assert result.status == "blocked"
+    assert calls == ["python"]
+
+
+def test_oversize_upstream_response_is_a_502(brave, monkeypatch, no_rate_limit):
+    monkeypatch.setattr(scraper, "_MAX_RESPONSE_BYTES", 1000)
+    brave(lambda request: httpx.Response(200, content=results_page("python") + b" " * 1000))
+
+    response = TestClient(api.app).post("/search", json={"query": "python"})
+
+    assert response.status_code == 502
+    assert response.json()["code"] == "agent.upstream_error"
@@ -0,0 +1,18 @@
+from serp_assignment.backoff import MAX_BACKOFF_SECONDS, backoff_delay
+
+
+def test_exponential_term_is_capped():
+    assert MAX_BACKOFF_SECONDS <= backoff_delay(10, None) < MAX_BACKOFF_SECONDS + 0.3
+
+
+def test_never_shorter_than_retry_after():
+    assert backoff_delay(0, "30") >= 30.0
+
+
+def test_gives_up_when_retry_after_exceeds_max_wait():
+    assert backoff_delay(0, "30", max_wait=10.0) is None
+    assert backoff_delay(0, "5", max_wait=10.0) >= 5.0
+
+
+def test_ignores_non_numeric_retry_after():
+    assert backoff_delay(0, "Wed, 21 Oct 2026 07:28:00 GMT") < 1.0
@@ -0,0 +1,327 @@
+import asyncio
+from html import escape
+
+import httpx
+import pytest
+
+from serp_assignment import scraper
+
+
+def results_page(query: str) -> bytes:
+    """A minimal Brave results page that, like the real one, echoes the query."""
+    q = escape(query)
+    return f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>{q} - Brave Search</title></head>
+<body>
+<form action="/search"><input name="q" value="{q}"></form>
+<div class="snippet" data-type="web">
+  <a href="https://example.com/"><div class="title">Result for {q}</div></a>
+  <div class="content">About {q}.</div>
+</div>
+</body></html>""".encode()
+
+
+CAPTCHA_PAGE = b"""<!doctype html>
+<html><head><title>Brave Search</title></head>
+<body><form id="captcha-form" action="/search/captcha"><button>Verify</button></form></body>
+</html>"""
+
+
+@pytest.mark.parametrize("query", ["recaptcha v3 tutorial", "are you a robot quiz"])
+def test_query_mentioning_captcha_is_not_blocked(brave, query):
+    brave(lambda request: httpx.Response(200, content=results_page(request.url.params["q"])))
+
+    result = asyncio.run(scraper.search(query))
+
+    assert result.status == "success"
+    assert [r.url for r in result.results] == ["https://example.com/"]
+
+
+def test_captcha_page_is_blocked(brave):
+    brave(lambda request: httpx.Response(200, content=CAPTCHA_PAGE))
+
+    assert asyncio.run(scraper.search("python")).status == "blocked"
+
+
+def test_redirect_to_captcha_is_blocked(brave):
+    brave(lambda request: httpx.Response(
+        302, headers={"Location": "https://search.brave.com/search/captcha?q=python"}
+    ))
+
+    assert asyncio.run(scraper.search("python")).status == "blocked"
+
+
+UNDECLARED_UTF8_PAGE = """<html><body>
+<div class="snippet" data-type="web">
+  <a href="https://example.com/"><div class="title">Café ☃</div></a>
+  <div class="content">Crème brûlée</div>
+</div>
+</body></html>""".encode("utf-8")
+
+LATIN1_PAGE = """<html><head><meta charset="iso-8859-1"></head><body>
+<div class="snippet" data-type="web">
+  <a href="https://example.com/"><div class="title">Café</div></a>
+  <div class="content">Crème brûlée</div>
+</div>
+</body></html>""".encode("latin-1")
+
+
+@pytest.mark.parametrize(
+    "page, title",
+    [(UNDECLARED_UTF8_PAGE, "Café ☃"), (LATIN1_PAGE, "Café")],
+)
+def test_both_parse_paths_decode_the_same(page, title):
+    encoding = scraper._page_encoding(page)
+    expected = [scraper._RawResult(title, "https://example.com/", "Crème brûlée")]
+
+    assert scraper._parse_fast(page, encoding) == expected
+    assert scraper._parse_stream(page, encoding) == expected
+
+
+def serp(*blocks: str) -> bytes:
+    body = "\n".join(blocks)
+    return f"""<html><head><meta charset="utf-8"></head><body>
+{body}
+<footer><div class="content">Footer</div></footer>
+</body></html>""".encode()
+
+
+def web_result(inner: str) -> str:
+    return f'<div class="snippet svelte-x" data-type="web">{inner}</div>'
+
+
+TITLE = '<a href="https://example.com/"><div class="title">Example</div></a>'
+
+# (page, expected results, whether the regex fast path should handle it)
+PARSE_CASES = {
+    "plain": (
+        serp(web_result(TITLE + '<div class="content">Some docs.</div>')),
+        [("Example", "https://example.com/", "Some docs.")],
+        True,
+    ),
+    "nested div in snippet": (
+        serp(web_result(
+            TITLE + '<div class="content">Read the docs.<div>nested</div> tail after nested</div>'
+        )),
+        [("Example", "https://example.com/", "Read the docs.nested tail after nested")],
+        True,
+    ),
+    "markup and entities": (
+        serp(web_result(
+            '<a href="https://example.com/?a=1&amp;b=2">'
+            '<div class="title search-snippet-title">Fish <strong>&amp;</strong> Chips</div></a>'
+            '<div class="snippet-description"><span>Very</span> <em>good</em></div>'
+        )),
+        [("Fish & Chips", "https://example.com/?a=1&b=2", "Very good")],
+        True,
+    ),
+    "missing snippet does not borrow the footer": (
+        serp(web_result(TITLE)),
+        [("Example", "https://example.com/", "")],
+        True,
+    ),
+    "several results, skipping non-web and non-http": (
+        serp(
+            web_result(TITLE),
+            '<div class="snippet" data-type="video"><a href="https://v.com/">'
+            '<div class="title">Video</div></a></div>',
+            web_result('<a href="/relative"><div class="title">Relative</div></a>'),
+            web_result(
+                '<a href="https://two.com/"><div class="title">Two</div></a>'
+                '<div class="content">Second</div>'
+            ),
+        ),
+        [("Example", "https://example.com/", ""), ("Two", "https://two.com/", "Second")],
+        True,
+    ),
+    "unclosed p": (
+        serp(web_result(TITLE + '<p class="snippet-description">Para')),
+        [("Example", "https://example.com/", "Para")],
+        False,
+    ),
+    "p closed implicitly by a div": (
+        serp(web_result(TITLE + '<p class="content">Para<div>after</div></p>')),
+        [("Example", "https://example.com/", "Para")],
+        False,
+    ),
+    "no title element falls back to the link text": (
+        serp(web_result('<a href="https://example.com/"><span>Link text</span></a>')),
+        [("Link text", "https://example.com/", "")],
+        False,
+    ),
+    "data-href is not the link": (
+        serp(web_result(
+            '<a data-href="https://evil.com/" href="https://good.com/">'
+            '<div class="title">Good</div></a>'
+        )),
+        [("Good", "https://good.com/", "")],
+        True,
+    ),
+    "result nested in another": (
+        serp(web_result(TITLE + web_result(
+            '<a href="https://inner.com/"><div class="title">Inner</div></a>'
+        ))),
+        [("Example", "https://example.com/", "")],
+        False,
+    ),
+    "single-quoted attributes": (
+        serp(
+            web_result(TITLE),
+            "<div class='snippet' data-type='web'><a href=\"https://two.com/\">"
+            "<div class='title'>Two</div></a></div>",
+        ),
+        [("Example", "https://example.com/", ""), ("Two", "https://two.com/", "")],
+        False,
+    ),
+    "script in snippet": (
+        serp(web_result(TITLE + '<div class="content">x<script>if (a<b) {}</script>y</div>')),
+        [("Example", "https://example.com/", "xif (a<b) {}y")],
+        False,
+    ),
+    "comment in snippet": (
+        serp(web_result(TITLE + '<div class="content">a<!-- <b>hidden</b> -->c</div>')),
+        [("Example", "https://example.com/", "ac")],
+        False,
+    ),
+}
+
+
+@pytest.mark.parametrize("page, expected, fast", PARSE_CASES.values(), ids=PARSE_CASES.keys())
+def test_parse_paths_agree(page, expected, fast):
+    expected = [scraper._RawResult(*fields) for fields in expected]
+    fast_results = scraper._parse_fast(page, "utf-8")
+
+    assert scraper._parse_stream(page, "utf-8") == expected
+    if fast:
+        assert fast_results == expected
+    else:
+        assert fast_results is None
+
+
+def test_parse_ranks_results():
+    page, _, _ = PARSE_CASES["several results, skipping non-web and non-http"]
+
+    result = scraper.parse(page, "query")
+
+    assert result.query == "query"
+    assert [(r.rank, r.url) for r in result.results] == [
+        (1, "https://example.com/"),
+        (2, "https://two.com/"),
+    ]
+
+
+def counting_results_page(calls):
+    """Handler serving results_page() and recording each query it's asked for."""
+    def handler(request):
+        calls.append(request.url.params["q"])
+        return httpx.Response(200, content=results_page(request.url.params["q"]))
+    return handler
+
+
+def test_cache_normalises_case_and_whitespace(brave):
+    calls = []
+    brave(counting_results_page(calls))
+
+    first = asyncio.run(scraper.search("Python  Web"))
+    second = asyncio.run(scraper.search(" python web "))
+
+    assert calls == ["Python  Web"]
+    assert second.query == " python web "
+    assert second.results == first.results
+
+
+def test_cache_hands_out_copies(brave):
+    brave(counting_results_page([]))
+
+    first = asyncio.run(scraper.search("python"))
+    first.results[0].title = "mutated"
+    first.results.clear()
+
+    assert asyncio.run(scraper.search("python")).results[0].title == "Result for python"
+
+
+def test_cache_entries_expire(brave):
+    calls = []
+    brave(counting_results_page(calls))
+    asyncio.run(scraper.search("python"))
+
+    stored_at, result = scraper._CACHE["python"]
+    scraper._CACHE["python"] = (stored_at - scraper._CACHE_TTL_SECONDS - 1, result)
+    asyncio.run(scraper.search("python"))
+
+    assert calls == ["python", "python"]
+
+
+def test_cache_evicts_least_recently_used(brave, monkeypatch):
+    calls = []
+    brave(counting_results_page(calls))
+    monkeypatch.setattr(scraper, "_CACHE_MAXSIZE", 2)
+
+    for query in ["a", "b", "a", "c", "a", "b"]:
+        asyncio.run(scraper.search(query))
+
+    # "a" was used again before "c" arrived, so "b" was the one evicted.
+    assert calls == ["a", "b", "c", "b"]
+    assert list(scraper._CACHE) == ["a", "b"]
+
+
+def test_empty_results_are_not_cached(brave):
+    calls = []
+
+    def empty_page(request):
+        calls.append(request.url.params["q"])
+        return httpx.Response(200, content=b"<html><body><p>Nothing here</p></body></html>")
+
+    brave(empty_page)
+    for _ in range(2):
+        result = asyncio.run(scraper.search("python"))
+
+    assert result.status == "success"
+    assert result.results == []
+    assert calls == ["python", "python"]
+
+
+def test_declared_oversize_response_is_rejected(brave, monkeypatch):
+    monkeypatch.setattr(scraper, "_MAX_RESPONSE_BYTES", 1000)
+    # httpx sets Content-Length from the body.
+    brave(lambda request: httpx.Response(200, content=results_page("python") + b" " * 1000))
+
+    result = asyncio.run(scraper.search("python"))
+
+    assert result.status == "request_error"
+    assert "too large" in result.error_message
+
+
+def test_streamed_oversize_response_is_rejected(brave, monkeypatch):
+    monkeypatch.setattr(scraper, "_MAX_RESPONSE_BYTES", 1000)
+
+    async def body():
+        # No Content-Length: only the running total can catch this.
+        for _ in range(10):
+            yield b" " * 200
+
+    brave(lambda request: httpx.Response(200, content=body()))
+
+    result = asyncio.run(scraper.search("python"))
+
+    assert result.status == "request_error"
+    assert "exceeded 1000 bytes" in result.error_message
+
+
+def test_captcha_after_a_large_head_is_blocked(brave):
+    page = CAPTCHA_PAGE.replace(
+        b"<head>", b"<head><script>" + b"x" * (3 * scraper._CHUNK_SIZE) + b"</script>"
+    )
+    brave(lambda request: httpx.Response(200, content=page))
+
+    assert asyncio.run(scraper.search("python")).status == "blocked"
+
+
+def test_captcha_markup_split_across_chunks_is_blocked(brave):
+    # Pad so the chunk boundary falls 5 bytes into the <form ...> tag.
+    form = CAPTCHA_PAGE.index(b"<form")
+    padding = b" " * (scraper._CHUNK_SIZE - form - 5)
+    page = CAPTCHA_PAGE[:form] + padding + CAPTCHA_PAGE[form:]
+    brave(lambda request: httpx.Response(200, content=page))
+
+    assert asyncio.run(scraper.search("python")).status == "blocked"